@@ -3,8 +3,7 @@ import logging
 import time
 import sys
 
-from problem2015g.puzzlereader import PuzzleReader
-from problem2015g.company import create_company_model
+from problem2015g.prefetcher import PuzzlePrefetcher
 
 log = logging.getLogger(__name__)
 
@@ -27,22 +26,22 @@ if __name__ == "__main__":
         input_file = PUZZLE_2_INPUT_FILE
         result_file = PUZZLE_2_RESULT_FILE
 
-    puzzle_reader = PuzzleReader(input_file, result_file)
+    # Read the next puzzle in another process while this one is solved.
+    puzzle_reader = PuzzlePrefetcher(input_file, result_file)
 
     while True:
-        next_puzzle = puzzle_reader.read_next_puzzle()
-        if next_puzzle is None:
+        iter_start_time = time.time()
+        prepared_puzzle = puzzle_reader.read_next_puzzle()
+        if prepared_puzzle is None:
             break
 
-        iter_start_time = time.time()
-        company = create_company_model(next_puzzle.num_employees,
-                                       next_puzzle.hierarchy_spec)
+        next_puzzle = prepared_puzzle.puzzle
+        company = prepared_puzzle.company
 
         log.info("Prep time: %.3fs", time.time() - iter_start_time)
         iter_start_time = time.time()
 
-        total = company.process_event_queue(next_puzzle.event_queue)
-        solution = total % (10**9 + 7)
+        solution = company.process_event_queue(next_puzzle.event_queue)
 
         log.info("Calculation time: %.3fs", time.time() - iter_start_time)
         log.info("Solution: %r", solution)
@@ -0,0 +1,200 @@
+# Outline of Design
+# -----------------
+#
+# - Lay the employees out in BFS order - sorted by depth, and within a depth
+#   by their position in a pre-order walk of the hierarchy. The employees
+#   managed by someone at any one depth then form a contiguous range of that
+#   depth's level, so a memo is just one range per level it reaches.
+# - Hold everyone's current tie in a single array in that order.
+# - Split the event stream into blocks of BLOCK_SIZE events. Reads in a
+#   block check the block's own memos first (the latest one covering the
+#   reader wins), and fall back to the tie array as it stood at the start of
+#   the block.
+# - Once a block is done, apply its memos to the tie array in bulk - find the
+#   range every memo covers on every level with one binary search across the
+#   whole block, then assign each range in turn, ready for the next block.
+
+import logging
+
+import numpy
+
+from .events import MODULUS, ReadEvent
+
+
+log = logging.getLogger(__name__)
+
+
+# The number of events in each block. Checking a block's reads against its
+# memos costs the square of this, while each block also has a fixed numpy
+# call overhead - on a million event input this was quickest at 128 - 256,
+# well below sqrt(Q).
+BLOCK_SIZE = 256
+
+
+class BatchCompany(object):
+    """ Represents a hierarchy of employees as flat numpy arrays. """
+
+    def __init__(self, num_employees, hierarchy_spec):
+        self._num_employees = num_employees
+
+        # Every manager has a lower number than those they manage, so a single
+        # pass in number order always sees a manager before their reports.
+        managers = [-1] + [manager_number - 1
+                           for manager_number in hierarchy_spec]
+        assert len(managers) == self._num_employees
+
+        depths = [0] * num_employees
+        for index in range(1, num_employees):
+            depths[index] = depths[managers[index]] + 1
+
+        # The number of employees managed (including themselves), and how
+        # many levels below them the hierarchy reaches.
+        sizes = [1] * num_employees
+        heights = [0] * num_employees
+        for index in range(num_employees - 1, 0, -1):
+            manager = managers[index]
+            sizes[manager] += sizes[index]
+            if heights[manager] <= heights[index]:
+                heights[manager] = heights[index] + 1
+
+        # Pre-order position of each employee, handing out consecutive slots
+        # to each manager's reports in turn.
+        pre_order = [0] * num_employees
+        next_slot = [1] * num_employees
+        for index in range(1, num_employees):
+            manager = managers[index]
+            pre_order[index] = next_slot[manager]
+            next_slot[manager] += sizes[index]
+            next_slot[index] = pre_order[index] + 1
+
+        self._depths = numpy.array(depths, dtype=numpy.int64)
+        self._sizes = numpy.array(sizes, dtype=numpy.int64)
+        self._heights = numpy.array(heights, dtype=numpy.int64)
+        self._pre_order = numpy.array(pre_order, dtype=numpy.int64)
+
+        bfs_order = numpy.lexsort((self._pre_order, self._depths))
+        self._positions = numpy.empty(num_employees, dtype=numpy.int64)
+        self._positions[bfs_order] = numpy.arange(num_employees)
+
+        # Sorted keys for finding the range of a manager's reports at a given
+        # depth with a binary search.
+        self._level_keys = (self._depths[bfs_order] * num_employees +
+                            self._pre_order[bfs_order])
+
+        log.info("Maximum depth: %r", heights[0])
+        log.info("Completed setup")
+
+    def _apply_memos(self, ties, memo_indexes, memo_importances, memo_ties):
+        """ Apply a block's memos to the tie array, in the order they were
+            sent.
+        """
+        # How many levels of the hierarchy each memo reaches.
+        num_levels = numpy.minimum(memo_importances,
+                                   self._heights[memo_indexes]) + 1
+        total_levels = int(num_levels.sum())
+
+        # Spread the memos out to one entry per level they reach, with the
+        # levels counting up from each memo's own depth.
+        level_offsets = (numpy.arange(total_levels) -
+                         numpy.repeat(numpy.cumsum(num_levels) - num_levels,
+                                      num_levels))
+        levels = (numpy.repeat(self._depths[memo_indexes], num_levels) +
+                  level_offsets)
+        firsts = numpy.repeat(self._pre_order[memo_indexes], num_levels)
+        lasts = firsts + numpy.repeat(self._sizes[memo_indexes], num_levels)
+
+        level_bases = levels * self._num_employees
+        starts = numpy.searchsorted(self._level_keys, level_bases + firsts)
+        ends = numpy.searchsorted(self._level_keys, level_bases + lasts)
+        range_ties = numpy.repeat(memo_ties, num_levels)
+
+        for start, end, tie in zip(starts.tolist(),
+                                   ends.tolist(),
+                                   range_ties.tolist()):
+            ties[start:end] = tie
+
+    def _process_block(self, ties, block):
+        """ Handle one block of events against the tie array as it stood at
+            the start of the block, then apply the block's memos to it.
+        """
+        read_indexes = []
+        multipliers = []
+        read_times = []
+        memo_indexes = []
+        memo_importances = []
+        memo_ties = []
+        memo_times = []
+
+        for time, next_event in enumerate(block):
+            if isinstance(next_event, ReadEvent):
+                read_indexes.append(next_event.person_number - 1)
+                multipliers.append(next_event.multiplier)
+                read_times.append(time)
+            else:
+                memo_indexes.append(next_event.person_number - 1)
+                memo_importances.append(next_event.importance)
+                memo_ties.append(next_event.tie)
+                memo_times.append(time)
+
+        total = 0
+
+        memo_indexes = numpy.array(memo_indexes, dtype=numpy.int64)
+        memo_importances = numpy.array(memo_importances, dtype=numpy.int64)
+        memo_ties = numpy.array(memo_ties, dtype=numpy.int64)
+
+        if len(read_indexes) > 0:
+            read_indexes = numpy.array(read_indexes, dtype=numpy.int64)
+            read_ties = ties[self._positions[read_indexes]]
+
+            if len(memo_indexes) > 0:
+                read_first = self._pre_order[read_indexes][:, None]
+                read_depths = self._depths[read_indexes][:, None]
+                memo_first = self._pre_order[memo_indexes][None, :]
+                memo_depths = self._depths[memo_indexes][None, :]
+
+                # Matrix of which memos reach which reads, from reads down
+                # and memos across.
+                covers = ((memo_first <= read_first) &
+                          (read_first <
+                           memo_first + self._sizes[memo_indexes][None, :]) &
+                          (memo_depths <= read_depths) &
+                          (read_depths - memo_depths <=
+                           memo_importances[None, :]) &
+                          (numpy.array(memo_times)[None, :] <
+                           numpy.array(read_times)[:, None]))
+
+                # The latest covering memo is the first one when looking
+                # across the matrix backwards.
+                latest = covers.shape[1] - 1 - numpy.argmax(covers[:, ::-1],
+                                                            axis=1)
+                covered = covers.any(axis=1)
+                read_ties = numpy.where(covered,
+                                        memo_ties[latest],
+                                        read_ties)
+
+            # Ties and multipliers are both below MODULUS, so each product
+            # fits in an int64 and reducing them keeps the sum in range too.
+            products = (read_ties *
+                        numpy.array(multipliers, dtype=numpy.int64)) % MODULUS
+            total = int(products.sum()) % MODULUS
+
+        if len(memo_indexes) > 0:
+            self._apply_memos(ties, memo_indexes, memo_importances, memo_ties)
+
+        return total
+
+    def process_event_queue(self, event_queue):
+        """ Handle a list of events and return the result of processing them,
+            modulo MODULUS.
+        """
+        # Everyone starts with a tie value of 1.
+        ties = numpy.ones(self._num_employees, dtype=numpy.int64)
+        total = 0
+
+        for block_start in range(0, len(event_queue), BLOCK_SIZE):
+            log.debug("Processing block at event: %r", block_start)
+            block_total = self._process_block(
+                ties, event_queue[block_start:block_start + BLOCK_SIZE])
+            total = (total + block_total) % MODULUS
+
+        return total
@@ -2,21 +2,20 @@
 # -----------------
 #
 # - Build a company, with an array of employees indexable by employee number.
-# - While building, track a list of leaf nodes - sorted by employee number,
-#   so when a report is added, they are added in sorted position (which falls
-#   out basically for free because they arrive in order), and their manager is
-#   searched for and removed if present (array is sorted so search is cheap).
-# - Calculate the management line for each leaf in turn, populate them with a
-#   summary, of this line then pop the end off the line and populate the
-#   summary for their manager, and so on.
-#     - A possible optimisation here is to check if the manager has a summary,
-#       and if so just defer to that.
+# - Managers always have a lower number than their reports, so building the
+#   employees in number order visits every manager before their reports. Work
+#   out each employee's depth and line summary in that same pass from their
+#   manager's, so setup is a single linear pass with no line rebuilding.
+# - A line summary is every SUMMARY_INTERVAL'th manager on the line from the
+#   root down (by depth), along with their depths. Everyone below the same
+#   summarised manager shares the same summary lists, so only those managers
+#   create new lists, and only once they have a report.
 
 import logging
 
 import bisect
 
-from .events import ReadEvent
+from .events import MODULUS, ReadEvent
 
 
 log = logging.getLogger(__name__)
@@ -36,41 +35,23 @@ class DeepCompany(object):
 
         self._init_employees_list()
 
-        sorted_leaf_employee_numbers = []
+        num_managers = 0
 
         for index, manager_number in enumerate(hierarchy_spec):
             employee_number = index + 2
             log.debug("Processing employee: %r", employee_number)
 
             manager = self.get_employee(manager_number)
+            if not manager.is_manager:
+                num_managers += 1
+            manager.add_report()
 
             new_employee = Employee(self, employee_number, manager)
             self._employees.append(new_employee)
 
-            mgr_idx = bisect.bisect_left(sorted_leaf_employee_numbers,
-                                         manager.number)
-            if (mgr_idx != len(sorted_leaf_employee_numbers) and
-                    sorted_leaf_employee_numbers[mgr_idx] == manager.number):
-                sorted_leaf_employee_numbers.pop(mgr_idx)
-            sorted_leaf_employee_numbers.append(new_employee.number)
-
         assert len(self._employees) == self._num_employees
 
-        log.info("Number of leaves: %r", len(sorted_leaf_employee_numbers))
-
-        for leaf_employee_number in sorted_leaf_employee_numbers:
-            log.debug("Processing leaf_employee: %r", leaf_employee_number)
-            leaf_employee = self.get_employee(leaf_employee_number)
-            full_line = leaf_employee.build_line_summary()
-            if full_line is None:
-                continue
-            manager = leaf_employee.manager
-            full_line.pop()
-            while manager.populate_line_summary(full_line):
-                log.debug("Processing manager: %r", manager.number)
-                manager = manager.manager
-                full_line.pop()
-
+        log.info("Number of leaves: %r", self._num_employees - num_managers)
         log.info("Completed setup")
 
     def _init_employees_list(self):
@@ -78,14 +59,14 @@ class DeepCompany(object):
             one and has no manager.
         """
         root_employee = Employee(self, 1, None)
-        root_employee.populate_line_summary([])
         self._employees = [root_employee]
 
     def get_employee(self, employee_number):
         return self._employees[employee_number - 1]
 
     def process_event_queue(self, event_queue):
-        """ Handle a list of events and return the result of processing them.
+        """ Handle a list of events and return the result of processing them,
+            modulo MODULUS.
         """
         total = 0
         read_queue = ReadEventQueue()
@@ -109,12 +90,13 @@ class DeepCompany(object):
                     managee = self.get_employee(read_queue[idx].person_number)
                     if managee.in_management_line(memo_event.person_number,
                                                   memo_event.importance):
-                        total += memo_event.tie * read_queue[idx].multiplier
+                        value = memo_event.tie * read_queue[idx].multiplier
+                        total = (total + value) % MODULUS
                         read_queue.pop(idx)
 
         # Any remaining events use the employee's initial tie value of 1.
         for idx in read_queue.reverse_index_range():
-            total += 1 * read_queue[idx].multiplier
+            total = (total + read_queue[idx].multiplier) % MODULUS
 
         return total
 
@@ -126,7 +108,15 @@ class Employee(object):
         self._company = company
         self._number = number
         self._manager = manager
-        self._line_summary = None
+        self._is_manager = False
+        self._own_summary = None
+
+        if self._manager is None:
+            self._depth = 0
+            self._line_summary = ([], [])
+        else:
+            self._depth = self._manager.depth + 1
+            self._line_summary = self._manager.own_summary
 
     @property
     def number(self):
@@ -137,46 +127,36 @@ class Employee(object):
         return self._manager
 
     @property
-    def line_summary(self):
-        return self._line_summary
-
-    def build_full_line(self):
-        full_line = []
-        manager = self._manager
-        while manager is not None:
-            full_line.append(manager.number)
-            manager = manager.manager
+    def depth(self):
+        return self._depth
 
-        full_line.reverse()
-        assert full_line[0] == 1
-        return full_line
+    @property
+    def is_manager(self):
+        return self._is_manager
 
-    def populate_line_summary(self, full_line):
-        if self._line_summary is not None:
-            return False
+    @property
+    def line_summary(self):
+        return self._line_summary
 
-        num_entries = len(full_line) / SUMMARY_INTERVAL
-        if num_entries <= 1:
-            self._line_summary = ([], [])
+    @property
+    def own_summary(self):
+        """ The line summary for this employee's reports - only set once they
+            have a report.
+        """
+        return self._own_summary
+
+    def add_report(self):
+        if self._is_manager:
+            return
+        self._is_manager = True
+
+        # The summary for this employee's reports - the same as this
+        # employee's, plus this employee if they are due to be summarised.
+        if self._depth % SUMMARY_INTERVAL == 0:
+            self._own_summary = (self._line_summary[0] + [self._number],
+                                 self._line_summary[1] + [self._depth])
         else:
-            employee_numbers = []
-            distance = []
-            for index in range(0, len(full_line), SUMMARY_INTERVAL):
-                employee_numbers.append(full_line[index])
-                distance.append(len(full_line) - index)
-            self._line_summary = (employee_numbers, distance)
-
-        return True
-
-    def build_line_summary(self):
-        if self._manager.line_summary is not None:
-            return None
-
-        full_line = self.build_full_line()
-
-        self.populate_line_summary(full_line)
-
-        return full_line
+            self._own_summary = self._line_summary
 
     def in_management_line(self, manager, max_distance):
         log.debug("Checking if %r is within %r of %r",
@@ -190,23 +170,20 @@ class Employee(object):
 
         # Jump to the closest place in the line using the summary.
         managee = self
-        if managee._line_summary is None:
-            managee = managee.manager
-            max_distance -= 1
+        summary_numbers, summary_depths = self._line_summary
 
-        log.debug("Looking in %r for %r", managee._line_summary[0], manager)
-        start_manager_idx = bisect.bisect_left(managee._line_summary[0],
-                                               manager)
+        log.debug("Looking in %r for %r", summary_numbers, manager)
+        start_manager_idx = bisect.bisect_left(summary_numbers, manager)
         log.debug("Found closest index of %r", start_manager_idx)
 
-        if start_manager_idx != len(managee._line_summary[0]):
+        if start_manager_idx != len(summary_numbers):
             log.debug("This is a better start position")
-            max_distance -= managee._line_summary[1][start_manager_idx]
+            max_distance -= self._depth - summary_depths[start_manager_idx]
             if max_distance < 0:
                 log.debug("Distance is too great")
                 return False
             managee = self._company.get_employee(
-                managee._line_summary[0][start_manager_idx])
+                summary_numbers[start_manager_idx])
 
         log.debug("Checking if %r is within %r of %r",
                   managee._number, max_distance, manager)
@@ -255,7 +232,9 @@ class ReadEventQueue(object):
                                    read_event.person_number)
         if (index != len(self._person_number_list) and
                 self._person_number_list[index] == read_event.person_number):
-            self._multiplier_list[index] += read_event.multiplier
+            self._multiplier_list[index] = (
+                (self._multiplier_list[index] + read_event.multiplier) %
+                MODULUS)
         else:
             self._person_number_list.insert(index, read_event.person_number)
             self._multiplier_list.insert(index, read_event.multiplier)
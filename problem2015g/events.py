@@ -4,5 +4,9 @@ from collections import namedtuple
 
 log = logging.getLogger(__name__)
 
+# Results are only needed modulo this, so totals are kept reduced by it as
+# they are built up rather than being allowed to grow unbounded.
+MODULUS = 10**9 + 7
+
 MemoEvent = namedtuple("MemoEvent", ["person_number", "importance", "tie"])
 ReadEvent = namedtuple("ReadEvent", ["person_number", "multiplier"])
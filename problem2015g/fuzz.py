@@ -0,0 +1,277 @@
+""" Differential fuzzing of the company models.
+
+Generates small random hierarchies and event streams, runs every model over
+them and checks they all agree with the reference model. Any case they
+disagree on, or raise an exception on, is shrunk down as far as possible
+before being reported.
+
+Run with `python -m problem2015g.fuzz [num_cases] [seed]`.
+"""
+
+import logging
+
+import sys
+
+from . import deepcompany
+from .deepcompany import DeepCompany
+from .events import MemoEvent, ReadEvent
+from .puzzlereader import PuzzleSpec
+from .referencecompany import ReferenceCompany
+from .shallowcompany import ShallowCompany
+
+try:
+    from . import batchcompany
+    from .batchcompany import BatchCompany
+except ImportError:
+    BatchCompany = None
+
+log = logging.getLogger(__name__)
+
+
+DEFAULT_NUM_CASES = 1000
+DEFAULT_SEED = 47
+
+MAX_EMPLOYEES = 12
+MAX_EVENTS = 30
+MAX_TIE = 5
+
+# Some puzzles use ties and multipliers up to the largest the real inputs
+# allow, so totals pass MODULUS and the models' reductions get checked too.
+LARGE_VALUE_PROBABILITY = 0.3
+MAX_LARGE_VALUE = 10**6
+
+# Small enough that the deep model's line summaries get used, and the batch
+# model splits events into several blocks, even in the tiny puzzles generated
+# here.
+FUZZ_SUMMARY_INTERVAL = 2
+FUZZ_BLOCK_SIZE = 3
+
+
+class PRNG(object):
+    """ The same generator g2gen.py uses to build the real inputs, so cases
+        can be reproduced from just a seed. (g2gen.py generates the inputs as
+        soon as it is imported, so it can't be imported from here.)
+    """
+
+    def __init__(self, seed):
+        self.seed = seed
+
+    def _random(self):
+        M, A = 2147483647, 16807
+        Q, R = M // A, M % A
+        self.seed = A * (self.seed % Q) - R * (self.seed // Q)
+        if self.seed <= 0:
+            self.seed += M
+        return self.seed
+
+    def random(self):
+        return self._random() * 1.0 / 2147483647
+
+    def randrange(self, n):
+        return self._random() % n
+
+    def randint(self, start, end):
+        return start + int(self._random() % (end - start + 1))
+
+
+def get_models():
+    """ Return the models to check against the reference model. """
+    models = [DeepCompany, ShallowCompany]
+    if BatchCompany is None:
+        log.warning("numpy not available, not checking BatchCompany")
+    else:
+        models.append(BatchCompany)
+    return models
+
+
+def generate_puzzle(random):
+    """ Generate a small random puzzle, with the expected result filled in by
+        the reference model.
+    """
+    num_employees = random.randint(1, MAX_EMPLOYEES)
+
+    # Sometimes build long chains, to get deep hierarchies as well as bushy
+    # ones.
+    chain_probability = random.random()
+    hierarchy_spec = []
+    for employee_index in range(1, num_employees):
+        if random.random() < chain_probability:
+            hierarchy_spec.append(employee_index)
+        else:
+            hierarchy_spec.append(random.randrange(employee_index) + 1)
+
+    large_values = random.random() < LARGE_VALUE_PROBABILITY
+    max_tie = MAX_LARGE_VALUE if large_values else MAX_TIE
+
+    event_queue = []
+    for event_no in range(1, random.randint(1, MAX_EVENTS) + 1):
+        person_number = random.randint(1, num_employees)
+        if random.random() < 0.1:
+            person_number = 1
+
+        if random.random() < 0.5:
+            multiplier = event_no
+            if large_values:
+                multiplier = random.randint(1, MAX_LARGE_VALUE)
+            event_queue.append(ReadEvent(person_number, multiplier))
+        else:
+            importance = random.randint(0, num_employees + 1)
+            if random.random() < 0.2:
+                importance = 0
+            event_queue.append(MemoEvent(person_number,
+                                         importance,
+                                         random.randint(1, max_tie)))
+
+    return with_expected_result(PuzzleSpec(num_employees,
+                                           hierarchy_spec,
+                                           event_queue,
+                                           None))
+
+
+def with_expected_result(puzzle):
+    company = ReferenceCompany(puzzle.num_employees, puzzle.hierarchy_spec)
+    return puzzle._replace(
+        expected_result=company.process_event_queue(puzzle.event_queue))
+
+
+def run_model(puzzle, model):
+    """ Return the result the model gets for the puzzle. """
+    company = model(puzzle.num_employees, puzzle.hierarchy_spec)
+    # Some models consume the queue, so give each one its own copy.
+    return company.process_event_queue(list(puzzle.event_queue))
+
+
+def find_failing_models(puzzle, models):
+    """ Return the models that get the wrong result for the puzzle, or raise
+        an exception trying.
+    """
+    failing_models = []
+    for model in models:
+        try:
+            total = run_model(puzzle, model)
+        except Exception:
+            log.debug("%s raised on: %r", model.__name__, puzzle,
+                      exc_info=True)
+            failing_models.append(model)
+            continue
+
+        if total != puzzle.expected_result:
+            failing_models.append(model)
+    return failing_models
+
+
+def describe_failure(puzzle, model):
+    """ Return a description of how the model fails on the puzzle. """
+    try:
+        total = run_model(puzzle, model)
+    except Exception as exc:
+        return "raised %r" % exc
+    return "returned %r, expected %r" % (total, puzzle.expected_result)
+
+
+def candidate_reductions(puzzle):
+    """ Yield smaller versions of the puzzle, most aggressive first. """
+    event_queue = puzzle.event_queue
+
+    # Drop chunks of events, halving the chunk size down to single events.
+    chunk_size = len(event_queue) // 2
+    while chunk_size > 0:
+        for start in range(0, len(event_queue), chunk_size):
+            yield puzzle._replace(
+                event_queue=(event_queue[:start] +
+                             event_queue[start + chunk_size:]))
+        chunk_size //= 2
+
+    # Drop the highest numbered employee along with any events for them - as
+    # nobody has a higher number, they can't be managing anyone.
+    if puzzle.num_employees > 1:
+        yield puzzle._replace(
+            num_employees=puzzle.num_employees - 1,
+            hierarchy_spec=puzzle.hierarchy_spec[:-1],
+            event_queue=[event for event in event_queue
+                         if event.person_number != puzzle.num_employees])
+
+    # Weaken memos down to the minimum importance and tie.
+    for index, event in enumerate(event_queue):
+        if isinstance(event, MemoEvent):
+            for reduced_event in (event._replace(importance=0),
+                                  event._replace(tie=1)):
+                if reduced_event != event:
+                    yield puzzle._replace(
+                        event_queue=(event_queue[:index] +
+                                     [reduced_event] +
+                                     event_queue[index + 1:]))
+
+
+def shrink_puzzle(puzzle, model):
+    """ Shrink a puzzle the model fails on to a smaller one it still fails
+        on, until no more reductions keep it failing.
+    """
+    shrunk = True
+    while shrunk:
+        shrunk = False
+        for candidate in candidate_reductions(puzzle):
+            candidate = with_expected_result(candidate)
+            if find_failing_models(candidate, [model]):
+                puzzle = candidate
+                shrunk = True
+                break
+
+    return puzzle
+
+
+def fuzz(num_cases, seed):
+    """ Check the models against the reference model on random puzzles,
+        returning a list of (model, shrunk puzzle) for each failure found.
+    """
+    random = PRNG(seed)
+    models = get_models()
+    failures = []
+
+    original_summary_interval = deepcompany.SUMMARY_INTERVAL
+    deepcompany.SUMMARY_INTERVAL = FUZZ_SUMMARY_INTERVAL
+    if BatchCompany is not None:
+        original_block_size = batchcompany.BLOCK_SIZE
+        batchcompany.BLOCK_SIZE = FUZZ_BLOCK_SIZE
+
+    try:
+        for case_no in range(num_cases):
+            log.debug("Checking case: %r", case_no)
+            puzzle = generate_puzzle(random)
+
+            for model in find_failing_models(puzzle, models):
+                shrunk_puzzle = shrink_puzzle(puzzle, model)
+                log.error("%s failed case %r, shrunk to: %r - %s",
+                          model.__name__, case_no, shrunk_puzzle,
+                          describe_failure(shrunk_puzzle, model))
+                failures.append((model, shrunk_puzzle))
+                models.remove(model)
+
+            if len(models) == 0:
+                break
+    finally:
+        deepcompany.SUMMARY_INTERVAL = original_summary_interval
+        if BatchCompany is not None:
+            batchcompany.BLOCK_SIZE = original_block_size
+
+    return failures
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+
+    num_cases = DEFAULT_NUM_CASES
+    seed = DEFAULT_SEED
+    if len(sys.argv) > 1:
+        num_cases = int(sys.argv[1])
+    if len(sys.argv) > 2:
+        seed = int(sys.argv[2])
+
+    # The models log every puzzle they set up, which drowns out the results.
+    logging.getLogger("problem2015g").setLevel(logging.WARNING)
+    log.setLevel(logging.INFO)
+
+    failures = fuzz(num_cases, seed)
+    log.info("Checked %r cases, %r models failed", num_cases, len(failures))
+
+    sys.exit(1 if failures else 0)
@@ -0,0 +1,150 @@
+# Outline of Design
+# -----------------
+#
+# - Read each puzzle in a separate process, as compact arrays of ints, and
+#   work out which model suits it there too.
+# - Models that hold their state in flat numpy arrays pickle in a fraction of
+#   the time they take to build, so build those in the reading process as
+#   well.
+# - The other models are large graphs of objects, which take longer to
+#   pickle than to build (and can be too deep for pickle to recurse
+#   through), as does the list of events. So those are built by the solver's
+#   process once it takes the puzzle.
+
+import logging
+
+import multiprocessing
+import queue
+import traceback
+
+from collections import namedtuple
+
+from .company import BatchCompany, choose_company_model, get_average_depth
+from .puzzlereader import PuzzleReader, expand_puzzle
+
+log = logging.getLogger(__name__)
+
+
+# How many read puzzles may be waiting for the solver at once. One more may be
+# being read behind them, but they are all held as compact arrays (of ints,
+# or the numpy arrays of a batch model) - only the puzzle being solved is
+# expanded into events and a graph of employees.
+DEFAULT_LOOKAHEAD = 1
+
+# How often to check that the reading process is still alive while waiting
+# for it, in seconds.
+POLL_INTERVAL = 1.0
+
+
+# Models that are built in the reading process.
+BACKGROUND_MODELS = tuple(model for model in [BatchCompany]
+                          if model is not None)
+
+
+# A puzzle as sent by the reading process - the company is only set if the
+# model is one of the BACKGROUND_MODELS.
+ReadPuzzle = namedtuple("ReadPuzzle", ["compact_puzzle", "model", "company"])
+
+# A puzzle ready for solving.
+PreparedPuzzle = namedtuple("PreparedPuzzle", ["puzzle", "company"])
+
+# Sent in place of a puzzle if reading fails. Exceptions can't always be
+# pickled, and lose their traceback when they are, so send it formatted.
+ReaderFailure = namedtuple("ReaderFailure", ["traceback"])
+
+
+class PuzzleReaderError(Exception):
+    """Reading puzzles in the prefetching process failed."""
+
+
+def _read_puzzles(definition_file_path, result_file_path, puzzle_queue):
+    """Read each puzzle in turn and queue it, followed by None once there are
+       no more. Runs in the prefetching process."""
+    # Anything that goes wrong is handed over to be raised in the solver's
+    # process, rather than silently ending the run.
+    try:
+        puzzle_reader = PuzzleReader(definition_file_path, result_file_path)
+        while True:
+            compact_puzzle = puzzle_reader.read_next_compact_puzzle()
+            if compact_puzzle is None:
+                break
+
+            model = choose_company_model(
+                compact_puzzle.num_employees,
+                get_average_depth(compact_puzzle.hierarchy_spec))
+            company = None
+            if model in BACKGROUND_MODELS:
+                company = model(compact_puzzle.num_employees,
+                                compact_puzzle.hierarchy_spec)
+
+            puzzle_queue.put(ReadPuzzle(compact_puzzle, model, company))
+    except Exception:
+        puzzle_queue.put(ReaderFailure(traceback.format_exc()))
+    else:
+        puzzle_queue.put(None)
+
+
+class PuzzlePrefetcher(object):
+    """Reads puzzles in a separate process, so that reading and preparing the
+       next puzzle overlaps with solving the current one."""
+
+    def __init__(self, definition_file_path, result_file_path,
+                 lookahead=DEFAULT_LOOKAHEAD):
+        self._queue = multiprocessing.Queue(maxsize=lookahead)
+        self._finished = False
+
+        self._process = multiprocessing.Process(target=_read_puzzles,
+                                                args=(definition_file_path,
+                                                      result_file_path,
+                                                      self._queue),
+                                                name="puzzle-prefetcher")
+        self._process.daemon = True
+        self._process.start()
+
+    def _get_from_queue(self):
+        """Wait for the next item from the reading process, raising an error
+           if it exits without sending one."""
+        while True:
+            try:
+                return self._queue.get(timeout=POLL_INTERVAL)
+            except queue.Empty:
+                if self._process.is_alive():
+                    continue
+
+            # It may have sent something just before exiting.
+            try:
+                return self._queue.get(timeout=POLL_INTERVAL)
+            except queue.Empty:
+                raise PuzzleReaderError(
+                    "Puzzle reading process exited with code %r" %
+                    self._process.exitcode)
+
+    def read_next_puzzle(self):
+        """Wait for the next puzzle, returning it along with its company
+           model, or None once there are no more."""
+        if self._finished:
+            return None
+
+        try:
+            read_puzzle = self._get_from_queue()
+        except PuzzleReaderError:
+            self._finished = True
+            raise
+
+        if isinstance(read_puzzle, ReaderFailure):
+            self._finished = True
+            raise PuzzleReaderError("Reading puzzles failed:\n%s" %
+                                    read_puzzle.traceback)
+
+        if read_puzzle is None:
+            self._finished = True
+            self._process.join()
+            return None
+
+        puzzle = expand_puzzle(read_puzzle.compact_puzzle)
+        company = read_puzzle.company
+        if company is None:
+            company = read_puzzle.model(puzzle.num_employees,
+                                        puzzle.hierarchy_spec)
+
+        return PreparedPuzzle(puzzle, company)
@@ -1,5 +1,6 @@
 import logging
 
+from array import array
 from collections import namedtuple
 
 from .events import ReadEvent, MemoEvent
@@ -12,6 +13,33 @@ PuzzleSpec = namedtuple("PuzzleSpec", ["num_employees",
                                        "event_queue",
                                        "expected_result"])
 
+# The same puzzle with the events held as flat arrays of ints, which is far
+# quicker to pass between processes than a list of events.
+CompactPuzzleSpec = namedtuple("CompactPuzzleSpec", ["num_employees",
+                                                     "hierarchy_spec",
+                                                     "person_numbers",
+                                                     "importances",
+                                                     "ties",
+                                                     "expected_result"])
+
+
+def expand_puzzle(compact_puzzle):
+    """Build the full puzzle spec from a compact one."""
+    event_queue = []
+    for event_no, (person_number, importance, tie) in enumerate(
+            zip(compact_puzzle.person_numbers,
+                compact_puzzle.importances,
+                compact_puzzle.ties), 1):
+        if tie == 0:
+            event_queue.append(ReadEvent(person_number, event_no))
+        else:
+            event_queue.append(MemoEvent(person_number, importance, tie))
+
+    return PuzzleSpec(compact_puzzle.num_employees,
+                      list(compact_puzzle.hierarchy_spec),
+                      event_queue,
+                      compact_puzzle.expected_result)
+
 
 class PuzzleReader(object):
     """Wrapper around the file defining the puzzle inputs."""
@@ -32,16 +60,26 @@ class PuzzleReader(object):
         self._handle.readline()
 
     def read_next_puzzle(self):
+        compact_puzzle = self.read_next_compact_puzzle()
+        if compact_puzzle is None:
+            return None
+
+        return expand_puzzle(compact_puzzle)
+
+    def read_next_compact_puzzle(self):
         if self._end_of_file:
             return None
 
         n, c, q = map(int, self._handle.readline().strip().split(" "))
         log.info("num employees, num_ties, num_events: %r, %r, %r", n, c, q)
 
-        hierarchy_spec = list(map(int,
-                                  self._handle.readline().strip().split(" ")))
+        hierarchy_spec = array("i", map(int,
+                                        self._handle.readline().strip()
+                                        .split(" ")))
 
-        event_queue = []
+        person_numbers = array("i")
+        importances = array("i")
+        ties = array("i")
         event_no = 1
 
         next_line = self._handle.readline().strip()
@@ -50,11 +88,9 @@ class PuzzleReader(object):
             person_number, importance, tie = map(int, next_line.split(" "))
             if tie == 0:
                 assert importance == 0
-                event_queue.append(ReadEvent(person_number, event_no))
-            else:
-                event_queue.append(MemoEvent(person_number,
-                                             importance,
-                                             tie))
+            person_numbers.append(person_number)
+            importances.append(importance)
+            ties.append(tie)
 
             next_line = self._handle.readline()
             if next_line == "":
@@ -62,8 +98,13 @@ class PuzzleReader(object):
             next_line = next_line.strip()
             event_no += 1
 
-        assert len(event_queue) == q
+        assert len(person_numbers) == q
 
         expected_result = int(self._result_handle.readline().strip())
 
-        return PuzzleSpec(n, hierarchy_spec, event_queue, expected_result)
+        return CompactPuzzleSpec(n,
+                                 hierarchy_spec,
+                                 person_numbers,
+                                 importances,
+                                 ties,
+                                 expected_result)
@@ -0,0 +1,71 @@
+import logging
+
+from .events import MODULUS, ReadEvent
+
+log = logging.getLogger(__name__)
+
+
+class ReferenceCompany(object):
+    """ The simplest possible model - every memo is passed straight down to
+        everyone it reaches. Far too slow for the real inputs, but easy to
+        trust, so used for checking the other models against.
+    """
+
+    def __init__(self, num_employees, hierarchy_spec):
+        self._num_employees = num_employees
+        self._employees = [Employee(1)]
+
+        for index, manager_number in enumerate(hierarchy_spec):
+            employee_number = index + 2
+            new_employee = Employee(employee_number)
+            self._employees.append(new_employee)
+            self._employees[manager_number - 1].add_report(new_employee)
+
+        assert len(self._employees) == num_employees
+
+    def get_employee(self, employee_number):
+        return self._employees[employee_number - 1]
+
+    def process_event_queue(self, event_queue):
+        """ Handle a list of events and return the result of processing them,
+            modulo MODULUS.
+        """
+        total = 0
+
+        for next_event in event_queue:
+            employee = self.get_employee(next_event.person_number)
+            if isinstance(next_event, ReadEvent):
+                total = ((total + next_event.multiplier * employee.tie) %
+                         MODULUS)
+            else:
+                # Work down the hierarchy a level at a time.
+                reached = [employee]
+                for _ in range(next_event.importance + 1):
+                    if len(reached) == 0:
+                        break
+                    for managee in reached:
+                        managee.tie = next_event.tie
+                    reached = [report
+                               for managee in reached
+                               for report in managee.reports]
+
+        return total
+
+
+class Employee(object):
+
+    def __init__(self, number):
+        self._number = number
+        self._reports = []
+        self.tie = 1
+
+    @property
+    def number(self):
+        return self._number
+
+    @property
+    def reports(self):
+        return self._reports
+
+    def add_report(self, report):
+        self._reports.append(report)
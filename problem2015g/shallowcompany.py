@@ -1,6 +1,6 @@
 import logging
 
-from .events import MemoEvent, ReadEvent
+from .events import MODULUS, MemoEvent, ReadEvent
 
 log = logging.getLogger(__name__)
 
@@ -52,7 +52,8 @@ class ShallowCompany(object):
         return result
 
     def process_event_queue(self, event_queue):
-        """ Handle a list of events and return the result of processing them.
+        """ Handle a list of events and return the result of processing them,
+            modulo MODULUS.
         """
         memo_queue = MemoQueue()
         total = 0
@@ -61,8 +62,10 @@ class ShallowCompany(object):
             log.debug("Processing event number: %r", index)
             log.debug("Events queued: %r", len(memo_queue))
             if isinstance(next_event, ReadEvent):
-                total += (next_event.multiplier *
-                          self.get_tie(memo_queue, next_event.person_number))
+                total = ((total +
+                          next_event.multiplier *
+                          self.get_tie(memo_queue, next_event.person_number)) %
+                         MODULUS)
             else:
                 memo_queue.append(next_event)
 